@@ -0,0 +1,60 @@
+import os
+
+# Desktop Chrome UA; the default HeadlessChrome/python-requests UAs get routed through anti-bot checks
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# Resources neither scraper reads; blocked so page loads only pull the HTML
+BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg',
+                '*.woff', '*.woff2', '*.ttf', '*.mp4', '*.css']
+
+def xpath_has_class(name):
+    """XPath predicate matching name as a whole class, like a CSS .name selector"""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+def add_common_chrome_options(options):
+    """Apply the user agent, memory and load settings shared by every scraper's Chrome"""
+    options.add_argument(f'--user-agent={USER_AGENT}')
+    
+    # Trim helper processes and background work to keep Chrome's memory footprint small
+    options.add_argument('--renderer-process-limit=1')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-sync')
+    options.add_argument('--disable-translate')
+    options.add_argument('--disable-features=TranslateUI,BlinkGenPropertyTrees')
+    options.add_argument('--mute-audio')
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    
+    # Return from driver.get at DOMContentLoaded; callers wait for the elements they need
+    options.page_load_strategy = 'eager'
+    
+    # Don't download images or show notification prompts
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.default_content_setting_values.notifications': 2
+    })
+
+def block_resources(driver):
+    """Block fonts, media and stylesheets at the network layer via CDP"""
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+    driver.execute_cdp_cmd('Network.enable', {})
+
+class SeenUrls:
+    """On-disk set of article URLs that were already scraped in earlier runs"""
+    def __init__(self, filename):
+        self.filename = filename
+        self.urls = set()
+        if os.path.exists(filename):
+            with open(filename, encoding='utf-8') as f:
+                self.urls = set(f.read().splitlines())
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def add(self, url):
+        if url in self.urls:
+            return
+        self.urls.add(url)
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write(url + '\n')
@@ -1,9 +1,41 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from lxml import etree, html as lh
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import requests
+import json
+
+from scraper_utils import SeenUrls, USER_AGENT, add_common_chrome_options, block_resources, xpath_has_class
+
+# Shared HTTP session so article fetches reuse keep-alive connections
+session = requests.Session()
+session.headers.update({"User-Agent": USER_AGENT})
+
+MAX_WORKERS = 5  # Max concurrent article fetches (keeps load on the site polite)
+
+# XPath equivalents of div.teaser.offset and div.description.current-news-block.portrait p,
+# compiled once and reused for every page.
+# Teasers without a link or teaser paragraph are skipped by the XPath itself.
+TEASER_XPATH = etree.XPath(f'//div[{xpath_has_class("teaser")} and {xpath_has_class("offset")}]'
+                           '[.//a[@href] and .//p]')
+CONTENT_XPATH = etree.XPath(f'//div[{xpath_has_class("description")} and {xpath_has_class("current-news-block")}'
+                            f' and {xpath_has_class("portrait")}]//p')
+
+# Parse an HTTP response using the charset from its Content-Type header. Without one,
+# requests assumes Latin-1 and lxml ignores the header entirely, which garbles Nepali
+# text, so fall back to the encoding detected from the body instead.
+def parse_response(resp):
+    if 'charset' in resp.headers.get('Content-Type', '').lower():
+        encoding = resp.encoding
+    else:
+        encoding = resp.apparent_encoding
+    return lh.fromstring(resp.content, parser=lh.HTMLParser(encoding=encoding))
 
 # Configure Selenium WebDriver
 def setup_driver():
@@ -12,86 +44,138 @@ def setup_driver():
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
+    add_common_chrome_options(chrome_options)
     
     service = Service('chromedriver.exe')  # Adjust path to your chromedriver
     driver = webdriver.Chrome(service=service, options=chrome_options)
+    
+    block_resources(driver)
     return driver
 
-# Scrape articles
-def scrape_articles(base_url,news_url, max_articles=2):
+# Fetch the server-rendered listing page and return its parsed HTML
+def fetch_listing(news_url):
+    resp = session.get(news_url, timeout=10)
+    resp.raise_for_status()
+    return parse_response(resp)
+
+# Render the listing in Chrome, for when the teasers are built client-side
+def render_listing(news_url):
     driver = setup_driver()
-    driver.get(news_url)
+    try:
+        driver.get(news_url)
+        # Wait until the teaser blocks are actually in the DOM
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.teaser.offset'))
+        )
+        return lh.fromstring(driver.page_source)
+    finally:
+        driver.quit()
+
+# Extract title, teaser text and absolute link from one teaser block
+def parse_teaser(article, base_url):
+    title_tag = article.xpath('.//a[@href]')[0]  # Get the title and link
+    link = title_tag.get('href')
+    if link.startswith('/'):  # Handle relative links
+        link = base_url + link
+    return {
+        'title': title_tag.text_content().strip(),
+        'teaser': article.xpath('.//p')[0].text_content().strip(),  # Get the teaser text
+        'link': link
+    }
+
+# Yield teasers whose link was not scraped in an earlier run, each link only once
+def new_teasers(teasers, seen):
+    taken = set()
+    for teaser in teasers:
+        if teaser['link'] in seen or teaser['link'] in taken:
+            continue
+        taken.add(teaser['link'])
+        yield teaser
+
+# Scrape articles
+def scrape_articles(base_url,news_url, writer, seen, max_articles=2):
     all_articles = []
     
     try:
-        time.sleep(2)  # Allow page to load
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Plain HTTP first; only start Chrome if the teasers need JavaScript to render
+        articles = TEASER_XPATH(fetch_listing(news_url))
+        if not articles:
+            articles = TEASER_XPATH(render_listing(news_url))
             
-            # Extract article title, teaser, and link
-        articles = soup.find_all('div', class_='teaser offset', limit=max_articles)  # Adjust based on the website's structure
-        for article in articles:
-            try:
-                title_tag = article.find('a')  # Get the title and link
-                teaser = article.find('p').text.strip()  # Get the teaser text
-                link = title_tag['href']
-                    
-                if link.startswith('/'):  # Handle relative links
-                    link = base_url + link
-                    print(link)
-                    
-                full_content = scrape_article_content(driver,link)  # Fetch full content
-                all_articles.append({
-                    'title': title_tag.text.strip(),
-                    'teaser': teaser,
-                    'link': link,
-                    'content': full_content
-                })
-            except Exception as e:
-                print(f"Error scraping article: {e}")
+        # Parse teasers lazily and stop once max_articles new (not previously scraped) ones are found
+        teasers = (parse_teaser(article, base_url) for article in articles)
+        all_articles = list(islice(new_teasers(teasers, seen), max_articles))
             
-            # # Handle pagination (if applicable)
-            # try:
-            #     next_button = driver.find_element(By.CLASS_NAME, 'next')  # Replace with actual button class
-            #     next_button.click()
-            #     time.sleep(2)
-            # except Exception as e:
-            #     print(f"No more pages or pagination error: {e}")
-            #     break
-    finally:
-        driver.quit()
+        # # Handle pagination (if applicable)
+        # try:
+        #     next_button = driver.find_element(By.CLASS_NAME, 'next')  # Replace with actual button class
+        #     next_button.click()
+        #     time.sleep(2)
+        # except Exception as e:
+        #     print(f"No more pages or pagination error: {e}")
+        #     break
+    except requests.RequestException as e:
+        print(f"Error loading article listing: {e}")
+    except TimeoutException:
+        print("Timed out waiting for articles to load")
+    
+    # Fetch full content for all collected links concurrently, writing each
+    # article out as soon as it arrives instead of holding the bodies in memory.
+    # Failed fetches are not written or marked seen, so the next run retries them.
+    saved = 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        contents = executor.map(scrape_article_content, [a['link'] for a in all_articles])
+        for article, full_content in zip(all_articles, contents):
+            if full_content is None:
+                continue
+            writer.write({**article, 'content': full_content})
+            seen.add(article['link'])
+            saved += 1
     
-    return all_articles
+    return saved
 
 # Scrape full content of individual article
-def scrape_article_content(driver,url):
-    
-    driver.get(url)    
+# Article pages are server-rendered, so a plain HTTP GET is enough (no browser needed)
+def scrape_article_content(url):
     try:
-        time.sleep(2)
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        resp = session.get(url, timeout=10)
+        resp.raise_for_status()
+        doc = parse_response(resp)
         
         # Extract article content
-        article_section = soup.find('div', class_='description current-news-block portrait')
-        if not article_section:
+        paragraphs = CONTENT_XPATH(doc)  # All <p> tags inside the article body
+        if not paragraphs:
             return None
 
-        paragraphs = article_section.find_all('p') # Extract all <p> tags
-        full_content = ' '.join([p.text.strip() for p in paragraphs])  # Combine paragraph text
+        full_content = ' '.join([p.text_content().strip() for p in paragraphs])  # Combine paragraph text
         return full_content
     except Exception as e:
         print(f"Error loading article content: {e}")
         return None
 
-# Save articles to a file
-def save_articles(articles, filename='articles.json'):
-    import json
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, ensure_ascii=False, indent=4)
+# Stream articles to a file, one JSON object per line (NDJSON).
+# Appends, so articles from earlier runs are kept alongside new ones.
+class ArticleWriter:
+    def __init__(self, filename='articles.jsonl'):
+        self.f = open(filename, 'a', encoding='utf-8')
+
+    def write(self, article):
+        self.f.write(json.dumps(article, ensure_ascii=False) + "\n")
+        self.f.flush()  # Keep the file usable if the run is interrupted
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 # Main Execution
 if __name__ == "__main__":
     base_url = "https://ekantipur.com"  # Adjust if needed
     news_url = f"{base_url}/news"
-    articles = scrape_articles(base_url,news_url)
-    save_articles(articles)
-    print(f"Scraped {len(articles)} articles.")
+    with ArticleWriter() as writer:
+        count = scrape_articles(base_url,news_url, writer, SeenUrls('ekantipur_seen_urls.txt'))
+    print(f"Scraped {count} articles.")
@@ -5,14 +5,74 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
+from lxml import etree, html as lh
+import copy
+import csv
 import time
 import logging
 from datetime import datetime
 import os
+import re
 from urllib3.exceptions import ReadTimeoutError
 from requests.exceptions import RequestException
-from tenacity import retry, stop_after_attempt, wait_exponential
+
+from scraper_utils import SeenUrls, add_common_chrome_options, block_resources, xpath_has_class
+
+# Article field selectors, compiled once and reused for every page
+_XP_TITLE = etree.XPath(f'//h1[{xpath_has_class("news-big-title")}]')
+_XP_DATE = etree.XPath(f'//span[{xpath_has_class("news-time")}]')
+_XP_CONTENT = etree.XPath(f'//div[{xpath_has_class("news-content")}]')
+_XP_CATEGORY = etree.XPath(f'//div[{xpath_has_class("breadcrumb")}]')
+_XP_AUTHOR = etree.XPath(f'//div[{xpath_has_class("author-name")}]')
+
+# Elements that start a new line in rendered text, like Selenium's .text
+_BLOCK_TAGS = ('p', 'div', 'br', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+               'blockquote', 'figure', 'figcaption', 'table', 'tr', 'section', 'article')
+
+# Column order of the output CSV
+CSV_FIELDS = ['url', 'title', 'date', 'content', 'category', 'author']
+
+# Scrolls to the bottom until no new 'a.title' links appear for two rounds (or
+# max_scrolls is hit), then resolves with the de-duplicated setopati.com hrefs
+SCROLL_COLLECT_JS = """
+const [maxScrolls, pauseMs, done] = arguments;
+const seen = new Set();
+let scrolls = 0, stable = 0;
+function step() {
+    window.scrollTo(0, document.body.scrollHeight);
+    setTimeout(() => {
+        const before = seen.size;
+        document.querySelectorAll('a.title').forEach(a => {
+            if (a.href && a.href.includes('setopati.com')) seen.add(a.href);
+        });
+        stable = seen.size === before ? stable + 1 : 0;
+        scrolls++;
+        if (stable >= 2 || scrolls >= maxScrolls) done(Array.from(seen));
+        else step();
+    }, pauseMs);
+}
+step();
+"""
+SCROLL_PAUSE_MS = 1500
+
+_driver_path = None
+
+def get_driver_path():
+    """Resolve the chromedriver binary once per process instead of on every (re)start"""
+    global _driver_path
+    if _driver_path is None:
+        _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+def with_retry(fn, *args, attempts=3):
+    """Call fn(*args), retrying WebDriver failures with exponential backoff (4s, 8s, capped at 10s)"""
+    for attempt in range(attempts):
+        try:
+            return fn(*args)
+        except (TimeoutException, WebDriverException):
+            if attempt == attempts - 1:
+                raise
+            time.sleep(min(4 * 2 ** attempt, 10))
 
 class NewsScraperSetopati:
     def __init__(self, headless=True):
@@ -37,6 +97,9 @@ class NewsScraperSetopati:
         self.options.add_argument('--no-sandbox')
         self.options.add_argument('--disable-dev-shm-usage')
         
+        # User agent, memory-saving flags, eager page load, no images
+        add_common_chrome_options(self.options)
+        
         # Add timeout settings
         self.options.add_argument('--timeout=300000')  # 5 minute timeout
         self.options.add_argument('--page-load-timeout=300000')
@@ -48,6 +111,9 @@ class NewsScraperSetopati:
         # Suppress DevTools listening message
         os.environ['PYTHONWARNINGS'] = 'ignore'
         
+        # Skip articles already scraped in previous runs
+        self.seen = SeenUrls('setopati_seen_urls.txt')
+        
         self.setup_driver()
 
     def setup_driver(self):
@@ -57,12 +123,13 @@ class NewsScraperSetopati:
         
         while attempt < max_attempts:
             try:
-                service = Service(ChromeDriverManager().install())
+                service = Service(get_driver_path())
                 self.driver = webdriver.Chrome(
                     service=service,
                     options=self.options
                 )
                 self.driver.set_page_load_timeout(300)  # 5 minutes
+                block_resources(self.driver)
                 self.wait = WebDriverWait(self.driver, 30)  # Increased wait time
                 break
             except Exception as e:
@@ -72,150 +139,155 @@ class NewsScraperSetopati:
                     raise Exception("Failed to initialize WebDriver after multiple attempts")
                 time.sleep(5)  # Wait before retrying
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def get_article_links(self, url, max_scrolls=5):
         """
-        Scroll through the page and collect article links with retry mechanism
+        Scroll through the page and collect article links (call through with_retry)
         """
-        article_links = set()
         try:
             self.driver.get(url)
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'a.title')))
+            
+            # Run the whole scroll/collect loop in the browser and get the hrefs back in one call
+            self.driver.set_script_timeout(max_scrolls * SCROLL_PAUSE_MS / 1000 + 30)
+            article_links = self.driver.execute_async_script(
+                SCROLL_COLLECT_JS, max_scrolls, SCROLL_PAUSE_MS
+            )
             
-            for scroll in range(max_scrolls):
-                try:
-                    # Scroll with error handling
-                    self.driver.execute_script(
-                        "window.scrollTo(0, document.body.scrollHeight);"
-                    )
-                    
-                    # Wait for new content with explicit wait
-                    self.wait.until(lambda driver: len(driver.find_elements(
-                        By.CSS_SELECTOR, 'a.title')) > len(article_links)
-                    )
-                    
-                    # Find all article links
-                    links = self.driver.find_elements(By.CSS_SELECTOR, 'a.title')
-                    for link in links:
-                        href = link.get_attribute('href')
-                        if href and 'setopati.com' in href:
-                            article_links.add(href)
-                            
-                    time.sleep(2)  # Controlled delay between scrolls
-                    
-                except TimeoutException:
-                    logging.warning(f"Timeout during scroll {scroll + 1}, continuing...")
-                    continue
-                    
             logging.info(f"Collected {len(article_links)} article links")
-            return list(article_links)
+            return article_links
             
         except WebDriverException as e:
             logging.error(f"WebDriver error while collecting links: {str(e)}")
             self.restart_driver()
-            raise  # Retry through decorator
+            raise  # Retried by with_retry
         except Exception as e:
             logging.error(f"Unexpected error collecting links: {str(e)}")
             raise
 
     def restart_driver(self):
         """Restart the WebDriver if it encounters issues"""
+        # Keep the running browser if its session still responds; cold-starting Chrome is slow
+        try:
+            self.driver.current_url
+            return
+        except Exception:
+            pass
+        
         try:
             self.driver.quit()
         except:
             pass
         self.setup_driver()
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def scrape_article(self, url):
         """
-        Scrape individual article content with retry mechanism
+        Scrape individual article content (call through with_retry)
         """
         try:
             self.driver.get(url)
             
             # Wait for main content with increased timeout
-            content_element = self.wait.until(
+            self.wait.until(
                 EC.presence_of_element_located((By.CLASS_NAME, 'news-content'))
             )
             
-            # Get article data with explicit waits
+            # Pull the page once and extract every field locally
+            doc = lh.fromstring(self.driver.page_source)
             article_data = {
                 'url': url,
-                'title': self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'h1.news-big-title'))
-                ).text,
-                'date': self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'span.news-time'))
-                ).text,
-                'content': content_element.text,
-                'category': self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.breadcrumb'))
-                ).text
+                'title': self._extract_text(doc, _XP_TITLE),
+                'date': self._extract_text(doc, _XP_DATE),
+                'content': self._extract_block_text(doc, _XP_CONTENT),
+                'category': self._extract_text(doc, _XP_CATEGORY),
+                'author': self._extract_text(doc, _XP_AUTHOR, 'Unknown')
             }
             
-            # Try to get author if available
-            try:
-                article_data['author'] = self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.author-name'))
-                ).text
-            except TimeoutException:
-                article_data['author'] = 'Unknown'
+            # Don't save (or mark seen) pages that came back without a title or body
+            if not article_data['title'] or not article_data['content']:
+                logging.warning(f"Missing title or content, skipping article: {url}")
+                return None
                 
             logging.info(f"Successfully scraped article: {url}")
             return article_data
             
         except TimeoutException as e:
             logging.error(f"Timeout while scraping article {url}: {str(e)}")
-            raise  # Retry through decorator
+            raise  # Retried by with_retry
         except WebDriverException as e:
             logging.error(f"WebDriver error while scraping {url}: {str(e)}")
             self.restart_driver()
-            raise  # Retry through decorator
+            raise  # Retried by with_retry
         except Exception as e:
             logging.error(f"Unexpected error scraping {url}: {str(e)}")
             raise
 
+    @staticmethod
+    def _extract_text(doc, xpath, default=''):
+        """Return the whitespace-collapsed text of the first node matching a compiled XPath, or default"""
+        nodes = xpath(doc)
+        if not nodes:
+            return default
+        return ' '.join(nodes[0].text_content().split())
+
+    @staticmethod
+    def _extract_block_text(doc, xpath):
+        """Return the visible text of the first node matching a compiled XPath, one block per line"""
+        nodes = xpath(doc)
+        if not nodes:
+            return ''
+        node = copy.deepcopy(nodes[0])
+        for el in node.xpath('.//script|.//style'):
+            el.drop_tree()
+        # Collapse source whitespace, then break lines around block elements
+        # so paragraphs, list items and headings stay apart
+        for el in node.iter():
+            el.text = re.sub(r'\s+', ' ', el.text) if el.text else el.text
+            el.tail = re.sub(r'\s+', ' ', el.tail) if el.tail else el.tail
+        for el in node.iter(*_BLOCK_TAGS):
+            el.text = '\n' + (el.text or '')
+            el.tail = '\n' + (el.tail or '')
+        lines = (' '.join(line.split()) for line in node.text_content().splitlines())
+        return '\n'.join(line for line in lines if line)
+
     def scrape_website(self, base_url, max_articles=50):
         """
-        Main function to scrape the website with error recovery
+        Main function to scrape the website with error recovery.
+        Articles are written to CSV as they are scraped; returns how many were saved.
         """
+        saved = 0
         try:
             # Get article links with retry
-            article_links = self.get_article_links(base_url)[:max_articles]
+            article_links = with_retry(self.get_article_links, base_url)
+            article_links = [url for url in article_links if url not in self.seen][:max_articles]
             
             if not article_links:
-                logging.error("No article links found")
-                return pd.DataFrame()
+                logging.error("No new article links found")
+                return saved
             
-            # Scrape articles
-            articles_data = []
-            for url in article_links:
-                try:
-                    article_data = self.scrape_article(url)
-                    if article_data:
-                        articles_data.append(article_data)
-                    time.sleep(2)  # Increased delay between requests
-                except Exception as e:
-                    logging.error(f"Failed to scrape article {url}: {str(e)}")
-                    continue
+            # Scrape articles, streaming each row to the CSV
+            filename = f'setopati_articles_{datetime.now().strftime("%Y%m%d_%H%M")}.csv'
+            with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+                writer.writeheader()
                 
-            # Create DataFrame
-            df = pd.DataFrame(articles_data)
-            
-            if not df.empty:
-                # Save to CSV with error handling
-                filename = f'setopati_articles_{datetime.now().strftime("%Y%m%d_%H%M")}.csv'
-                try:
-                    df.to_csv(filename, index=False, encoding='utf-8-sig')
-                    logging.info(f"Successfully saved {len(df)} articles to {filename}")
-                except Exception as e:
-                    logging.error(f"Error saving to CSV: {str(e)}")
+                for url in article_links:
+                    try:
+                        article_data = with_retry(self.scrape_article, url)
+                        if article_data:
+                            writer.writerow(article_data)
+                            f.flush()
+                            self.seen.add(url)
+                            saved += 1
+                    except Exception as e:
+                        logging.error(f"Failed to scrape article {url}: {str(e)}")
+                        continue
             
-            return df
+            logging.info(f"Successfully saved {saved} articles to {filename}")
+            return saved
             
         except Exception as e:
             logging.error(f"Error in main scraping process: {str(e)}")
-            return pd.DataFrame()
+            return saved
             
         finally:
             try:
@@ -227,10 +299,10 @@ class NewsScraperSetopati:
 if __name__ == "__main__":
     try:
         scraper = NewsScraperSetopati(headless=True)
-        df = scraper.scrape_website(
+        count = scraper.scrape_website(
             base_url="https://www.setopati.com",
             max_articles=20
         )
-        print(f"Scraped {len(df)} articles successfully!")
+        print(f"Scraped {count} articles successfully!")
     except Exception as e:
         print(f"Scraping failed: {str(e)}")
\ No newline at end of file